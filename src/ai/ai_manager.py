@@ -1,9 +1,155 @@
+import asyncio
 import logging
-from typing import Dict, List, Optional
-from .base_ai_client import BaseAIClient
-from .glm4_client import GLM4Client
-from .openai_client import OpenAIClient
-from .anthropic_client import AnthropicClient
+import math
+from collections import Counter
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from .trading_signal import TradingSignal
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba不可用时退化为纯Python实现
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+    prange = range
+
+if TYPE_CHECKING:
+    from .base_ai_client import BaseAIClient
+
+RSI_PERIOD = 14
+MA_PERIOD = 20
+BB_STD_DEV = 2
+MACD_FAST = 12
+MACD_SLOW = 26
+INDICATOR_CACHE_BARS = 2
+
+# 风控内核使用的动作编码, ACTION_OTHER 表示未识别的动作(原样保留)
+ACTION_BUY, ACTION_SELL, ACTION_HOLD, ACTION_OTHER = 0, 1, 2, 3
+ACTION_CODES = {'BUY': ACTION_BUY, 'SELL': ACTION_SELL, 'HOLD': ACTION_HOLD}
+ACTION_NAMES = ('BUY', 'SELL', 'HOLD')
+
+# 风控调整说明位标记
+RISK_NOTE_LOW_CONFIDENCE = 1
+RISK_NOTE_POSITION_CAPPED = 2
+RISK_NOTE_REDUCE = 4
+
+
+@njit(cache=True)
+def _risk_adjust_core(action_code, confidence, position_size, current_position, conf_thresh, max_pos):
+    """风控调整内核, 返回 (动作编码, 仓位, 说明位标记)"""
+    notes = 0
+    if confidence < conf_thresh:
+        # 置信度低于阈值，调整为HOLD
+        action_code = ACTION_HOLD
+        position_size = 0.0
+        notes |= RISK_NOTE_LOW_CONFIDENCE
+    elif position_size > max_pos:
+        # 限制最大仓位
+        position_size = max_pos
+        notes |= RISK_NOTE_POSITION_CAPPED
+        
+    # 有持仓但AI建议HOLD且置信度很低时，建议减仓
+    if current_position > 0 and action_code == ACTION_HOLD and confidence < 0.4:
+        action_code = ACTION_SELL
+        position_size = min(current_position, 0.5)  # 减仓50%
+        notes |= RISK_NOTE_REDUCE
+        
+    return action_code, position_size, notes
+
+
+@njit(parallel=True, cache=True)
+def _risk_adjust_batch(actions, confidences, sizes, positions, conf_thresh, max_pos):
+    """回测场景下对整段序列批量应用风控调整"""
+    n = actions.shape[0]
+    out_actions = np.empty(n, dtype=np.int64)
+    out_sizes = np.empty(n, dtype=np.float64)
+    out_notes = np.empty(n, dtype=np.int64)
+    for i in prange(n):
+        action_code, position_size, notes = _risk_adjust_core(
+            actions[i], confidences[i], sizes[i], positions[i], conf_thresh, max_pos
+        )
+        out_actions[i] = action_code
+        out_sizes[i] = position_size
+        out_notes[i] = notes
+    return out_actions, out_sizes, out_notes
+
+
+def _extract_closes(market_data: Dict) -> np.ndarray:
+    """从K线数据中提取收盘价序列"""
+    ohlcv = market_data.get('ohlcv')
+    if not ohlcv:
+        return np.empty(0, dtype=np.float64)
+    return np.ascontiguousarray(np.asarray(ohlcv, dtype=np.float64)[:, 4])
+
+
+def _closed_bar_state(closed: np.ndarray) -> Dict:
+    """基于已收盘K线计算指标递推状态, 每根K线只需计算一次"""
+    state = {}
+    n = closed.size
+    if n == 0:
+        return state
+    state['last_close'] = float(closed[-1])
+    
+    # MA20 / 布林带: 保存最近 MA_PERIOD-1 根收盘价的和与平方和
+    if n >= MA_PERIOD - 1:
+        window = closed[n - (MA_PERIOD - 1):]
+        state['window_sum'] = float(window.sum())
+        state['window_sumsq'] = float(np.dot(window, window))
+        
+    # RSI: Wilder平滑 (alpha=1/period)
+    if n >= RSI_PERIOD:
+        delta = np.diff(closed)
+        gains = np.where(delta > 0, delta, 0.0)
+        losses = np.where(delta < 0, -delta, 0.0)
+        state['avg_gain'] = float(pd.Series(gains).ewm(alpha=1 / RSI_PERIOD, adjust=False).mean().iloc[-1])
+        state['avg_loss'] = float(pd.Series(losses).ewm(alpha=1 / RSI_PERIOD, adjust=False).mean().iloc[-1])
+        
+    # MACD: EMA12 - EMA26
+    if n >= MACD_SLOW - 1:
+        series = pd.Series(closed)
+        state['ema_fast'] = float(series.ewm(span=MACD_FAST, adjust=False).mean().iloc[-1])
+        state['ema_slow'] = float(series.ewm(span=MACD_SLOW, adjust=False).mean().iloc[-1])
+        
+    return state
+
+
+def _update_indicators(state: Dict, close: float) -> Dict:
+    """用最新(未收盘)价格递推指标, O(1): V[t] = V[t-1] + (S[t] - S[t-w]) / w"""
+    indicators = {}
+    
+    if 'window_sum' in state:
+        sma = (state['window_sum'] + close) / MA_PERIOD
+        var = (state['window_sumsq'] + close * close) / MA_PERIOD - sma * sma
+        std = math.sqrt(max(var, 0.0))
+        indicators['ma20'] = sma
+        indicators['bb_middle'] = sma
+        indicators['bb_upper'] = sma + BB_STD_DEV * std
+        indicators['bb_lower'] = sma - BB_STD_DEV * std
+        
+    if 'avg_gain' in state:
+        delta = close - state['last_close']
+        alpha = 1 / RSI_PERIOD
+        avg_gain = state['avg_gain'] + alpha * (max(delta, 0.0) - state['avg_gain'])
+        avg_loss = state['avg_loss'] + alpha * (max(-delta, 0.0) - state['avg_loss'])
+        indicators['rsi'] = 100.0 if avg_loss == 0 else 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        
+    if 'ema_fast' in state:
+        ema_fast = state['ema_fast'] + 2 / (MACD_FAST + 1) * (close - state['ema_fast'])
+        ema_slow = state['ema_slow'] + 2 / (MACD_SLOW + 1) * (close - state['ema_slow'])
+        indicators['macd'] = ema_fast - ema_slow
+        
+    return indicators
+
+
+def _compute_indicators(closes: np.ndarray) -> Dict:
+    """基于收盘价序列计算技术指标, 只返回最新值"""
+    if closes.size == 0:
+        return {}
+    return _update_indicators(_closed_bar_state(closes[:-1]), float(closes[-1]))
+
 
 class AIManager:
     """AI模型管理器"""
@@ -11,43 +157,69 @@ class AIManager:
     def __init__(self, config: Dict):
         self.config = config
         self.logger = logging.getLogger(__name__)
-        self.clients: Dict[str, BaseAIClient] = {}
-        self.active_client: Optional[BaseAIClient] = None
+        self.clients: Dict[str, 'BaseAIClient'] = {}
+        self.active_client: Optional['BaseAIClient'] = None
+        # (symbol, K线开盘时间) -> 已收盘K线的指标递推状态
+        self._ind_cache: Dict[Tuple[str, int], Dict] = {}
         
         self.setup_clients()
         
+    async def __aenter__(self):
+        return self
+        
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+        
+    async def aclose(self):
+        """关闭AI客户端共享的HTTP客户端"""
+        if not self.clients:
+            return
+        from .base_ai_client import close_shared_client
+        try:
+            await close_shared_client()
+        except Exception as e:
+            self.logger.error("关闭AI客户端HTTP客户端失败: %s", e)
+            
+    async def stop(self):
+        """停止AI管理器"""
+        await self.aclose()
+        
     def setup_clients(self):
         """设置AI客户端"""
         ai_config = self.config.get('ai_models', {})
         
+        # 仅在启用时导入对应客户端模块
         # GLM4客户端
         if ai_config.get('glm4', {}).get('enabled', False):
             try:
+                from .glm4_client import GLM4Client
                 self.clients['glm4'] = GLM4Client(ai_config['glm4'])
                 self.active_client = self.clients['glm4']
                 self.logger.info("GLM4客户端初始化成功")
             except Exception as e:
-                self.logger.error(f"GLM4客户端初始化失败: {e}")
+                self.logger.error("GLM4客户端初始化失败: %s", e)
                 
         # OpenAI客户端
         if ai_config.get('openai', {}).get('enabled', False):
             try:
+                from .openai_client import OpenAIClient
                 self.clients['openai'] = OpenAIClient(ai_config['openai'])
                 if not self.active_client:
                     self.active_client = self.clients['openai']
                 self.logger.info("OpenAI客户端初始化成功")
             except Exception as e:
-                self.logger.error(f"OpenAI客户端初始化失败: {e}")
+                self.logger.error("OpenAI客户端初始化失败: %s", e)
                 
         # Anthropic客户端
         if ai_config.get('anthropic', {}).get('enabled', False):
             try:
+                from .anthropic_client import AnthropicClient
                 self.clients['anthropic'] = AnthropicClient(ai_config['anthropic'])
                 if not self.active_client:
                     self.active_client = self.clients['anthropic']
                 self.logger.info("Anthropic客户端初始化成功")
             except Exception as e:
-                self.logger.error(f"Anthropic客户端初始化失败: {e}")
+                self.logger.error("Anthropic客户端初始化失败: %s", e)
                 
         if not self.active_client:
             self.logger.warning("没有可用的AI客户端，AI交易功能将不可用")
@@ -56,37 +228,136 @@ class AIManager:
         """切换AI客户端"""
         if client_name in self.clients:
             self.active_client = self.clients[client_name]
-            self.logger.info(f"切换到AI客户端: {client_name}")
+            self.logger.info("切换到AI客户端: %s", client_name)
             return True
         else:
-            self.logger.error(f"未知的AI客户端: {client_name}")
+            self.logger.error("未知的AI客户端: %s", client_name)
             return False
             
-    async def get_trading_signal(self, symbol: str, market_data: Dict, portfolio: Dict) -> Dict:
-        """获取交易信号"""
+    async def get_trading_signal(self, symbol: str, market_data: Dict, portfolio: Dict,
+                                 indicators: Optional[Dict] = None) -> Dict:
+        """获取交易信号, 可传入已计算的技术指标以避免重复计算"""
         if not self.active_client:
-            return self._get_default_signal("无可用AI客户端")
+            return self._get_default_signal("无可用AI客户端").to_dict()
             
         try:
             # 丰富市场数据
-            enriched_data = await self._enrich_market_data(symbol, market_data)
+            enriched_data = await self._enrich_market_data(symbol, market_data, indicators)
             
-            signal = await self.active_client.get_trading_signal(enriched_data, portfolio)
+            mode = self.config.get('ai_models', {}).get('mode', 'active')
+            if mode == 'race' and len(self.clients) > 1:
+                signal = await self._get_signal_raced(enriched_data, portfolio)
+            elif mode == 'ensemble' and len(self.clients) > 1:
+                signal = await self._get_signal_ensemble(enriched_data, portfolio)
+            else:
+                signal = await self.active_client.get_trading_signal(enriched_data, portfolio)
             
             # 应用风险调整
             adjusted_signal = self._apply_risk_adjustment(signal, portfolio)
             
-            self.logger.info(f"AI交易信号: {symbol} - {adjusted_signal['action']} (置信度: {adjusted_signal['confidence']:.2f})")
-            return adjusted_signal
+            self.logger.info(
+                "AI交易信号: %s - %s (置信度: %.2f)",
+                symbol, adjusted_signal.action, adjusted_signal.confidence
+            )
+            return adjusted_signal.to_dict()
+            
+        except Exception as e:
+            self.logger.error("获取AI交易信号失败: %s", e)
+            return self._get_default_signal(f"AI信号获取失败: {str(e)}").to_dict()
+            
+    async def get_trading_signals_batch(self, symbols_with_data: List[Tuple[str, Dict]],
+                                        portfolios: Dict[str, Dict]) -> Dict[str, Dict]:
+        """在一次AI请求中获取多个交易对的交易信号, portfolios按symbol提供持仓"""
+        if not self.active_client:
+            return {symbol: self._get_default_signal("无可用AI客户端").to_dict() for symbol, _ in symbols_with_data}
+            
+        try:
+            items = []
+            for symbol, market_data in symbols_with_data:
+                enriched_data = await self._enrich_market_data(symbol, market_data)
+                items.append((enriched_data, portfolios.get(symbol, {})))
+                
+            signals = await self.active_client.get_trading_signals_batch(items)
+            
+            adjusted = {}
+            for symbol, _ in symbols_with_data:
+                signal = self._apply_risk_adjustment(signals[symbol], portfolios.get(symbol, {}))
+                self.logger.info("AI交易信号: %s - %s (置信度: %.2f)", symbol, signal.action, signal.confidence)
+                adjusted[symbol] = signal.to_dict()
+            return adjusted
             
         except Exception as e:
-            self.logger.error(f"获取AI交易信号失败: {e}")
-            return self._get_default_signal(f"AI信号获取失败: {str(e)}")
+            self.logger.error("批量获取AI交易信号失败: %s", e)
+            reason = f"AI信号获取失败: {str(e)}"
+            return {symbol: self._get_default_signal(reason).to_dict() for symbol, _ in symbols_with_data}
+            
+    @staticmethod
+    def _is_valid_signal(result) -> bool:
+        """判断客户端返回的是否为有效(非降级)信号"""
+        return isinstance(result, TradingSignal) and result.source != 'fallback'
+        
+    def _request_timeout(self) -> float:
+        """所有客户端中最长的请求超时"""
+        return max(client.timeout for client in self.clients.values())
+        
+    async def _get_signal_raced(self, enriched_data: Dict, portfolio: Dict) -> TradingSignal:
+        """并发请求所有客户端, 返回最先到达的有效信号"""
+        tasks = [
+            asyncio.create_task(client.get_trading_signal(enriched_data, portfolio))
+            for client in self.clients.values()
+        ]
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=self._request_timeout(),
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    break
+                for task in done:
+                    if not task.cancelled() and task.exception() is None and self._is_valid_signal(task.result()):
+                        return task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+                
+        return self._get_default_signal("所有AI客户端均未返回有效信号")
+        
+    async def _get_signal_ensemble(self, enriched_data: Dict, portfolio: Dict) -> TradingSignal:
+        """并发请求所有客户端, 对action多数投票并平均置信度"""
+        results = await asyncio.gather(
+            *(client.get_trading_signal(enriched_data, portfolio) for client in self.clients.values()),
+            return_exceptions=True
+        )
+        signals = [r for r in results if self._is_valid_signal(r)]
+        if not signals:
+            return self._get_default_signal("所有AI客户端均未返回有效信号")
+            
+        votes = Counter(s.action for s in signals).most_common()
+        if len(votes) > 1 and votes[0][1] == votes[1][1]:
+            # 票数相同时保守处理
+            return self._get_default_signal(f"AI集成投票未达成一致: {dict(votes)}")
             
-    async def _enrich_market_data(self, symbol: str, market_data: Dict) -> Dict:
+        action = votes[0][0]
+        winners = [s for s in signals if s.action == action]
+        signal = max(winners, key=lambda s: s.confidence).copy()
+        signal.confidence = sum(s.confidence for s in winners) / len(winners)
+        signal.source = 'ensemble'
+        signal.reasoning = f"{signal.reasoning} (集成投票 {len(winners)}/{len(signals)})"
+        return signal
+        
+    async def get_indicators(self, symbol: str, market_data: Dict) -> Dict:
+        """获取技术指标(按K线缓存), 供调用方在多次AI请求间复用"""
+        return await self._get_cached_indicators(symbol, market_data)
+        
+    async def _enrich_market_data(self, symbol: str, market_data: Dict,
+                                  indicators: Optional[Dict] = None) -> Dict:
         """丰富市场数据"""
         # 添加技术指标计算
-        indicators = await self._calculate_technical_indicators(market_data)
+        if indicators is None:
+            indicators = await self._get_cached_indicators(symbol, market_data)
         
         enriched_data = {
             **market_data,
@@ -96,71 +367,86 @@ class AIManager:
         
         return enriched_data
         
-    async def _calculate_technical_indicators(self, market_data: Dict) -> Dict:
+    async def _get_cached_indicators(self, symbol: str, market_data: Dict) -> Dict:
+        """按 (symbol, 当前K线开盘时间) 缓存已收盘K线状态, 同一根K线内只做增量更新"""
+        ohlcv = market_data.get('ohlcv')
+        if not ohlcv:
+            return await self._calculate_technical_indicators(market_data)
+            
+        key = (symbol, int(ohlcv[-1][0]))
+        state = self._ind_cache.get(key)
+        if state is None:
+            closes = _extract_closes(market_data)
+            state = _closed_bar_state(closes[:-1])
+            self._ind_cache[key] = state
+            # FIFO淘汰该交易对较旧的K线
+            stale = [k for k in self._ind_cache if k[0] == symbol][:-INDICATOR_CACHE_BARS]
+            for k in stale:
+                del self._ind_cache[k]
+                
+        # 同一价格的重复请求(如先分析再交易)直接复用上次结果
+        close = float(ohlcv[-1][4])
+        if state.get('live_close') != close:
+            state['live_close'] = close
+            state['live_indicators'] = _update_indicators(state, close)
+        indicators = state['live_indicators']
+        indicators['volume'] = market_data.get('volume_24h', 0)
+        return indicators
+        
+    async def _calculate_technical_indicators(self, market_data: Dict,
+                                              closes: Optional[np.ndarray] = None) -> Dict:
         """计算技术指标"""
-        # 这里可以集成TA-Lib等技术指标库
-        # 简化实现，实际项目中应该计算真实的指标
-        return {
-            'rsi': 45.2,
-            'macd': -12.5,
-            'ma20': market_data.get('current_price', 0) * 0.98,
-            'bb_upper': market_data.get('current_price', 0) * 1.02,
-            'bb_middle': market_data.get('current_price', 0),
-            'bb_lower': market_data.get('current_price', 0) * 0.98,
-            'volume': market_data.get('volume_24h', 0)
-        }
+        if closes is None:
+            closes = _extract_closes(market_data)
+        indicators = _compute_indicators(closes)
+        indicators['volume'] = market_data.get('volume_24h', 0)
+        return indicators
         
-    def _apply_risk_adjustment(self, signal: Dict, portfolio: Dict) -> Dict:
+    def _apply_risk_adjustment(self, signal: TradingSignal, portfolio: Dict) -> TradingSignal:
         """应用风险调整"""
         trading_config = self.config.get('trading_ai', {})
         confidence_threshold = trading_config.get('confidence_threshold', 0.7)
         max_position = trading_config.get('max_ai_position_size', 0.3)
         
-        # 如果置信度低于阈值，调整为HOLD
-        if signal['confidence'] < confidence_threshold:
-            signal['action'] = 'HOLD'
-            signal['position_size'] = 0.0
-            signal['reasoning'] += f" (置信度{signal['confidence']:.2f}低于阈值{confidence_threshold})"
-            
-        # 限制最大仓位
-        if signal['position_size'] > max_position:
-            signal['position_size'] = max_position
-            signal['reasoning'] += f" (仓位限制为{max_position})"
-            
-        # 检查当前持仓，避免过度交易
-        current_position = portfolio.get('position_size', 0)
-        if current_position > 0 and signal['action'] == 'HOLD':
-            # 如果有持仓但AI建议HOLD，可以考虑减仓
-            if signal['confidence'] < 0.4:
-                signal['action'] = 'SELL'
-                signal['position_size'] = min(current_position, 0.5)  # 减仓50%
-                signal['reasoning'] += " (低置信度，建议减仓)"
-                
+        action = signal.action
+        confidence = float(signal.confidence)
+        action_code, position_size, flags = _risk_adjust_core(
+            ACTION_CODES.get(action, ACTION_OTHER),
+            confidence,
+            float(signal.position_size),
+            float(portfolio.get('position_size', 0)),
+            float(confidence_threshold),
+            float(max_position)
+        )
+        signal.action = action if action_code == ACTION_OTHER else ACTION_NAMES[action_code]
+        signal.position_size = position_size
+        
+        if flags:
+            notes = []
+            if flags & RISK_NOTE_LOW_CONFIDENCE:
+                notes.append(f" (置信度{confidence:.2f}低于阈值{confidence_threshold})")
+            if flags & RISK_NOTE_POSITION_CAPPED:
+                notes.append(f" (仓位限制为{max_position})")
+            if flags & RISK_NOTE_REDUCE:
+                notes.append(" (低置信度，建议减仓)")
+            signal.reasoning = (signal.reasoning or '') + "".join(notes)
         return signal
         
-    def _get_default_signal(self, reason: str) -> Dict:
+    def _get_default_signal(self, reason: str) -> TradingSignal:
         """获取默认信号"""
-        return {
-            "action": "HOLD",
-            "confidence": 0.3,
-            "position_size": 0.0,
-            "leverage": 1,
-            "stop_loss": None,
-            "take_profit": None,
-            "reasoning": reason,
-            "source": "default"
-        }
+        return TradingSignal(reasoning=reason)
         
-    async def analyze_market(self, symbol: str, market_data: Dict) -> Dict:
-        """分析市场"""
+    async def analyze_market(self, symbol: str, market_data: Dict, indicators: Optional[Dict] = None) -> Dict:
+        """分析市场, 可传入已计算的技术指标以避免重复计算"""
         if not self.active_client:
             return {"error": "无可用AI客户端"}
             
         try:
-            indicators = await self._calculate_technical_indicators(market_data)
+            if indicators is None:
+                indicators = await self._get_cached_indicators(symbol, market_data)
             return await self.active_client.analyze_market(symbol, indicators)
         except Exception as e:
-            self.logger.error(f"市场分析失败: {e}")
+            self.logger.error("市场分析失败: %s", e)
             return {"error": str(e)}
             
     async def get_position_recommendation(self, symbol: str, current_position: Dict) -> Dict:
@@ -171,7 +457,7 @@ class AIManager:
         try:
             return await self.active_client.get_position_recommendation(symbol, current_position)
         except Exception as e:
-            self.logger.error(f"仓位建议获取失败: {e}")
+            self.logger.error("仓位建议获取失败: %s", e)
             return {"error": str(e)}
             
     def get_available_clients(self) -> List[str]:
@@ -1,63 +1,53 @@
-import aiohttp
-import json
+import orjson
 import logging
-from typing import Dict
-from .base_ai_client import BaseAIClient
+from typing import ClassVar, Dict
+from .base_ai_client import BaseAIClient, USER_CONTENT_PLACEHOLDER
+from .trading_signal import TradingSignal
 
 class AnthropicClient(BaseAIClient):
     """Anthropic Claude客户端"""
     
+    _PROVIDER_NAME: ClassVar[str] = "Anthropic"
+    
     def __init__(self, config: Dict):
         super().__init__(config)
         self.api_key = config['api_key']
+        self._endpoint = "https://api.anthropic.com/v1/messages"
         self.max_tokens = config.get('max_tokens', 1000)
         self.temperature = config.get('temperature', 0.7)
-        self.timeout = config.get('timeout', 30)
         
-    async def get_trading_signal(self, market_data: Dict, portfolio: Dict) -> Dict:
+        # 预编码请求体静态部分, 每次请求只替换用户内容
+        self._signal_payload = orjson.dumps({
+            "model": self.model_name,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "system": self._get_system_prompt(),
+            "messages": [
+                {
+                    "role": "user",
+                    "content": USER_CONTENT_PLACEHOLDER
+                }
+            ]
+        })
+        
+    async def get_trading_signal(self, market_data: Dict, portfolio: Dict) -> TradingSignal:
         """获取Claude交易信号"""
         prompt = self._build_trading_prompt(market_data, portfolio)
-        
-        try:
-            async with aiohttp.ClientSession() as session:
-                headers = {
-                    "Content-Type": "application/json",
-                    "x-api-key": self.api_key,
-                    "anthropic-version": "2023-06-01"
-                }
-                
-                payload = {
-                    "model": self.model_name,
-                    "max_tokens": self.max_tokens,
-                    "temperature": self.temperature,
-                    "system": self._get_system_prompt(),
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ]
-                }
-                
-                async with session.post(
-                    "https://api.anthropic.com/v1/messages",
-                    headers=headers,
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=self.timeout)
-                ) as response:
-                    
-                    if response.status == 200:
-                        data = await response.json()
-                        ai_response = data['content'][0]['text']
-                        return self.parse_trading_signal(ai_response, market_data)
-                    else:
-                        error_text = await response.text()
-                        self.logger.error(f"Anthropic API错误: {response.status} - {error_text}")
-                        return self._get_fallback_signal()
-                        
-        except Exception as e:
-            self.logger.error(f"Anthropic请求失败: {e}")
+        ai_response = await self._chat(self._signal_payload, prompt)
+        if ai_response is None:
             return self._get_fallback_signal()
+        return self.parse_trading_signal(ai_response, market_data)
+        
+    def _auth_headers(self) -> Dict[str, str]:
+        """Anthropic使用x-api-key认证"""
+        return {
+            "x-api-key": self.api_key,
+            "anthropic-version": "2023-06-01"
+        }
+        
+    def _extract_content(self, data: Dict) -> str:
+        """取出Claude响应文本"""
+        return data['content'][0]['text']
             
     # 其他方法类似OpenAIClient的实现
     def _get_system_prompt(self) -> str:
@@ -67,16 +57,9 @@ class AnthropicClient(BaseAIClient):
         # 实现提示词构建
         return "交易分析请求..."
         
-    def parse_trading_signal(self, ai_response: str, market_data: Dict) -> Dict:
+    def parse_trading_signal(self, ai_response: str, market_data: Dict) -> TradingSignal:
         # 实现信号解析
         return self._get_fallback_signal()
         
-    def _get_fallback_signal(self) -> Dict:
-        return {
-            "action": "HOLD", 
-            "confidence": 0.3,
-            "position_size": 0.0,
-            "leverage": 1,
-            "reasoning": "Claude服务暂时不可用",
-            "source": "fallback"
-        }
+    def _get_fallback_signal(self) -> TradingSignal:
+        return TradingSignal(reasoning="Claude服务暂时不可用", source="fallback")
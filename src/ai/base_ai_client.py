@@ -1,18 +1,246 @@
 import abc
+import asyncio
+import functools
 import logging
-from typing import Dict, List, Optional, Any
-import json
+from typing import ClassVar, Dict, List, Optional, Any, Tuple
+import orjson
+import httpx
+from .trading_signal import TradingSignal
+
+
+def _extract_json(text: str) -> Optional[str]:
+    """单次扫描提取第一个括号平衡的JSON对象, 正确跳过字符串内的括号"""
+    start = text.find('{')
+    if start == -1:
+        return None
+        
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == '{':
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+
+def _json_default(obj: Any) -> Any:
+    """orjson无法直接序列化的类型: numpy标量等取原生值, 其余转为字符串"""
+    item = getattr(obj, 'item', None)
+    if callable(item):
+        return item()
+    return str(obj)
+
+
+def _dumps_pretty(obj: Any) -> str:
+    """以缩进格式序列化提示词中的数据, 兼容numpy/pandas产生的数值"""
+    return orjson.dumps(
+        obj,
+        default=_json_default,
+        option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    ).decode()
+
+
+# 预编码请求体中用户内容的占位符
+USER_CONTENT_PLACEHOLDER = "__USER_CONTENT__"
+_ENCODED_PLACEHOLDER = orjson.dumps(USER_CONTENT_PLACEHOLDER)
+
+# 所有AI客户端共享的HTTP/2客户端, 同一服务商的并发请求复用一条连接的多路流, 由 AIManager.aclose() 统一关闭
+_shared_client: Optional[httpx.AsyncClient] = None
+
+
+def get_shared_client() -> httpx.AsyncClient:
+    """获取共享HTTP客户端(惰性创建, 复用连接池)"""
+    global _shared_client
+    if _shared_client is None or _shared_client.is_closed:
+        _shared_client = httpx.AsyncClient(
+            # 绑定IPv4本地地址, 跳过IPv6回退带来的连接延迟
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=75),
+                local_address="0.0.0.0"
+            )
+        )
+    return _shared_client
+
+
+async def close_shared_client():
+    """关闭共享HTTP客户端"""
+    global _shared_client
+    if _shared_client is not None and not _shared_client.is_closed:
+        await _shared_client.aclose()
+    _shared_client = None
+
+
+def _clamp_signal(signal: TradingSignal, max_leverage: int = 20) -> TradingSignal:
+    """单次读取并裁剪置信度和杠杆; 仓位上限与置信度阈值统一由 AIManager 风控内核处理"""
+    confidence = float(signal.confidence)
+    position_size = float(signal.position_size)
+    leverage = int(signal.leverage)
+    signal.confidence = 0.0 if confidence < 0.0 else (1.0 if confidence > 1.0 else confidence)
+    signal.position_size = 0.0 if position_size < 0.0 else position_size
+    signal.leverage = 1 if leverage < 1 else (max_leverage if leverage > max_leverage else leverage)
+    return signal
+
+
+class _JSONObjectScanner:
+    """增量扫描字节流, 定位第一个顶层JSON对象的结束位置"""
+    
+    __slots__ = ('depth', 'in_string', 'escaped', 'started')
+    
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.started = False
+        
+    def feed(self, chunk: bytes) -> int:
+        """返回对象在该块中的结束偏移, 尚未闭合时返回-1"""
+        for i, b in enumerate(chunk):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif b == 0x5C:  # 反斜杠
+                    self.escaped = True
+                elif b == 0x22:  # "
+                    self.in_string = False
+            elif b == 0x22:
+                self.in_string = True
+            elif b == 0x7B:  # {
+                self.depth += 1
+                self.started = True
+            elif b == 0x7D and self.started:  # }
+                self.depth -= 1
+                if self.depth == 0:
+                    return i + 1
+        return -1
+
 
 class BaseAIClient(abc.ABC):
     """AI客户端基类"""
     
+    # 批量请求时追加到系统提示词之后的格式说明
+    _BATCH_INSTRUCTION: ClassVar[str] = """
+
+当请求包含多个以 "### SYMBOL:" 分隔的交易对时, 返回一个JSON对象:
+{"signals": [{"symbol": "交易对", "action": ..., "confidence": ..., ...}, ...]}
+每个交易对对应一条信号, 字段与单个交易对的要求相同。"""
+    
+    # 日志中使用的服务名, 由子类覆盖
+    _PROVIDER_NAME: ClassVar[str] = "AI"
+    
+    # 合并AI响应前的默认信号字段及信号来源标识, 由子类覆盖
+    _SIGNAL_DEFAULTS: ClassVar[Dict[str, Any]] = {"confidence": 0.5}
+    _SIGNAL_SOURCE: ClassVar[str] = "ai"
+    
     def __init__(self, config: Dict):
         self.config = config
         self.logger = logging.getLogger(__name__)
         self.model_name = config.get('model_name', 'default')
+        self.timeout = config.get('timeout', 30)
+        self._request_timeout = httpx.Timeout(self.timeout)
+        # 请求地址, 由子类在初始化时设置
+        self._endpoint = ''
+        
+    def _get_client(self) -> httpx.AsyncClient:
+        """获取所有AI客户端共享的HTTP客户端"""
+        return get_shared_client()
+        
+    def _build_payload_template(self, system_prompt: str, stream: bool = False,
+                                extra_fields: Optional[Dict[str, Any]] = None) -> bytes:
+        """预编码OpenAI兼容格式的请求体, 用户内容以占位符保留"""
+        payload = {
+            "model": self.model_name,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": system_prompt
+                },
+                {
+                    "role": "user",
+                    "content": USER_CONTENT_PLACEHOLDER
+                }
+            ],
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature
+        }
+        if extra_fields:
+            payload.update(extra_fields)
+        if stream:
+            payload["stream"] = True
+        return orjson.dumps(payload)
+        
+    @staticmethod
+    def _render_payload(template: bytes, prompt: str) -> bytes:
+        """将用户内容填入预编码的请求体模板"""
+        return template.replace(_ENCODED_PLACEHOLDER, orjson.dumps(prompt), 1)
+        
+    async def _read_first_json(self, response: httpx.Response) -> Dict:
+        """流式读取响应体, 顶层JSON对象闭合后即停止读取"""
+        scanner = _JSONObjectScanner()
+        buffer = bytearray()
+        async for chunk in response.aiter_bytes(4096):
+            end = scanner.feed(chunk)
+            if end != -1:
+                buffer += chunk[:end]
+                break
+            buffer += chunk
+        return orjson.loads(bytes(buffer))
+        
+    def _auth_headers(self) -> Dict[str, str]:
+        """认证请求头, 默认使用Bearer Token"""
+        return {"Authorization": f"Bearer {self.api_key}"}
+        
+    @functools.cached_property
+    def _headers(self) -> Dict[str, str]:
+        """完整请求头, 首次请求时构建后复用"""
+        return {"Content-Type": "application/json", **self._auth_headers()}
+        
+    def _extract_content(self, data: Dict) -> str:
+        """从响应中取出模型输出文本, 默认OpenAI兼容格式"""
+        return data['choices'][0]['message']['content']
         
+    async def _chat(self, payload_template: bytes, prompt: str) -> Optional[str]:
+        """发送对话请求, 返回模型输出文本, 失败时返回None"""
+        try:
+            client = self._get_client()
+            body = self._render_payload(payload_template, prompt)
+            
+            async with client.stream(
+                "POST",
+                self._endpoint,
+                headers=self._headers,
+                content=body,
+                timeout=self._request_timeout
+            ) as response:
+                
+                if response.status_code == 200:
+                    data = await self._read_first_json(response)
+                    return self._extract_content(data)
+                else:
+                    await response.aread()
+                    self.logger.error("%s API错误: %s - %s", self._PROVIDER_NAME, response.status_code, response.text)
+                    return None
+                    
+        except Exception as e:
+            self.logger.error("%s请求失败: %s", self._PROVIDER_NAME, e)
+            return None
+            
     @abc.abstractmethod
-    async def get_trading_signal(self, market_data: Dict, portfolio: Dict) -> Dict:
+    async def get_trading_signal(self, market_data: Dict, portfolio: Dict) -> TradingSignal:
         """获取交易信号"""
         pass
         
@@ -26,24 +254,63 @@ class BaseAIClient(abc.ABC):
         """获取仓位调整建议"""
         pass
         
+    async def get_trading_signals_batch(self, items: List[Tuple[Dict, Dict]]) -> Dict[str, TradingSignal]:
+        """批量获取交易信号, items为 (market_data, portfolio) 列表; 默认逐个并发请求"""
+        results = await asyncio.gather(
+            *(self.get_trading_signal(market_data, portfolio) for market_data, portfolio in items)
+        )
+        return {market_data.get('symbol'): signal for (market_data, _), signal in zip(items, results)}
+        
+    def _build_batch_prompt(self, items: List[Tuple[Dict, Dict]]) -> str:
+        """以 "### SYMBOL:" 分隔拼接多个交易对的提示词"""
+        return "\n".join(
+            f"### SYMBOL: {market_data.get('symbol', 'Unknown')}{self._build_trading_prompt(market_data, portfolio)}"
+            for market_data, portfolio in items
+        )
+        
+    async def _collect_batch_signals(self, parsed: Dict,
+                                     items: List[Tuple[Dict, Dict]]) -> Dict[str, TradingSignal]:
+        """按symbol分发批量响应, 缺失或无效的交易对退回逐个请求"""
+        signals = {}
+        entries = parsed.get('signals') if isinstance(parsed, dict) else None
+        if isinstance(entries, list):
+            for entry in entries:
+                if isinstance(entry, dict) and entry.get('symbol') and 'action' in entry:
+                    signal = self._build_signal(entry)
+                    if signal is not None:
+                        signals[entry['symbol']] = signal
+                    
+        missing = [(market_data, portfolio) for market_data, portfolio in items
+                   if market_data.get('symbol') not in signals]
+        if missing:
+            self.logger.warning("批量信号响应缺少 %d 个交易对, 改为逐个请求", len(missing))
+            signals.update(await BaseAIClient.get_trading_signals_batch(self, missing))
+            
+        return {market_data.get('symbol'): signals[market_data.get('symbol')] for market_data, _ in items}
+        
+    def _build_signal(self, parsed: Dict) -> Optional[TradingSignal]:
+        """将解析后的AI响应合并为标准信号并裁剪字段, 字段值无法转换时返回None"""
+        signal = TradingSignal(**self._SIGNAL_DEFAULTS).update(parsed)
+        try:
+            _clamp_signal(signal)
+        except (ValueError, TypeError) as e:
+            self.logger.error("%s信号字段无效: %s", self._PROVIDER_NAME, e)
+            return None
+        signal.source = self._SIGNAL_SOURCE
+        return signal
+        
     def parse_ai_response(self, response: str) -> Dict:
         """解析AI响应"""
         try:
-            # 尝试解析JSON响应
-            if response.startswith('{') and response.endswith('}'):
-                return json.loads(response)
-            
-            # 尝试提取JSON部分
-            start_idx = response.find('{')
-            end_idx = response.rfind('}') + 1
-            if start_idx != -1 and end_idx != 0:
-                json_str = response[start_idx:end_idx]
-                return json.loads(json_str)
+            # 提取第一个完整的JSON对象
+            json_str = _extract_json(response)
+            if json_str is not None:
+                return orjson.loads(json_str)
                 
             # 如果无法解析JSON，返回原始响应
-            self.logger.warning(f"无法解析AI响应为JSON: {response}")
+            self.logger.warning("无法解析AI响应为JSON: %s", response)
             return {"raw_response": response, "confidence": 0.5}
             
-        except json.JSONDecodeError as e:
-            self.logger.error(f"AI响应JSON解析错误: {e}")
+        except orjson.JSONDecodeError as e:
+            self.logger.error("AI响应JSON解析错误: %s", e)
             return {"error": str(e), "raw_response": response, "confidence": 0.3}
@@ -1,13 +1,39 @@
-from .base_ai_client import BaseAIClient
-from .glm4_client import GLM4Client
-from .openai_client import OpenAIClient
-from .anthropic_client import AnthropicClient
-from .ai_manager import AIManager
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # 仅供类型检查和 flake8 识别 __all__ 中的名称, 运行时仍按需导入
+    from .base_ai_client import BaseAIClient
+    from .glm4_client import GLM4Client
+    from .openai_client import OpenAIClient
+    from .anthropic_client import AnthropicClient
+    from .ai_manager import AIManager
+    from .trading_signal import TradingSignal
+
+# 按需导入: 访问属性时才加载对应模块, 避免未启用的客户端拖入HTTP依赖
+_LAZY_ATTRS = {
+    'BaseAIClient': '.base_ai_client',
+    'GLM4Client': '.glm4_client',
+    'OpenAIClient': '.openai_client',
+    'AnthropicClient': '.anthropic_client',
+    'AIManager': '.ai_manager',
+    'TradingSignal': '.trading_signal'
+}
 
 __all__ = [
     'BaseAIClient',
     'GLM4Client', 
     'OpenAIClient',
     'AnthropicClient',
-    'AIManager'
+    'AIManager',
+    'TradingSignal'
 ]
+
+
+def __getattr__(name):
+    module_path = _LAZY_ATTRS.get(name)
+    if module_path is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_path, __package__), name)
+    globals()[name] = value
+    return value
@@ -1,153 +1,201 @@
-import aiohttp
-import json
+import orjson
 import logging
-from typing import Dict
+import re
+from typing import Any, ClassVar, Dict, List, Optional, Tuple
+import functools
+import itertools
 from .base_ai_client import BaseAIClient
+from .trading_signal import TradingSignal
+
+# 流式输出中 reasoning 字段的起始位置
+_REASONING_KEY = re.compile(r',\s*"reasoning"\s*:')
+# 提前返回前必须已解析出的字段; 缺少任一字段(如 reasoning 不在最后)时继续读取
+_SIGNAL_FIELDS = ('action', 'confidence', 'position_size', 'leverage', 'stop_loss', 'take_profit')
 
 class OpenAIClient(BaseAIClient):
     """OpenAI兼容客户端"""
     
+    _PROVIDER_NAME: ClassVar[str] = "OpenAI"
+    _SIGNAL_SOURCE: ClassVar[str] = "openai"
+    
+    # 要求模型只输出JSON对象
+    _PAYLOAD_EXTRA_FIELDS: ClassVar[Dict[str, Any]] = {"response_format": {"type": "json_object"}}
+    
+    _SYSTEM_PROMPT: ClassVar[str] = """你是一个专业的加密货币量化交易AI助手。请基于技术分析和风险管理给出交易建议。
+
+始终以JSON格式返回，包含:
+- action: "BUY", "SELL", "HOLD"
+- confidence: 0.0-1.0
+- position_size: 0.0-1.0
+- leverage: 1-20
+- stop_loss: 价格或百分比
+- take_profit: 价格或百分比
+- reasoning: 交易逻辑"""
+    
+    # 交易提示词模板的静态片段, 与 _format_prompt 中的取值交替拼接
+    _PROMPT_SEGMENTS: ClassVar[Tuple[str, ...]] = (
+        "\n分析 ",
+        " 交易对:\n\n价格: $",
+        "\n24h变化: ",
+        "%\n\n技术指标:\n- RSI(14): ",
+        "\n- MACD: ",
+        "\n- 移动平均线: MA20=",
+        "\n- 布林带: 上",
+        " 中",
+        " 下",
+        "\n\n当前持仓: ",
+        "\n仓位大小: ",
+        "\n\n请给出交易建议。\n",
+    )
+    
     def __init__(self, config: Dict):
         super().__init__(config)
         self.base_url = config.get('base_url', 'https://api.openai.com/v1')
+        self._endpoint = f"{self.base_url}/chat/completions"
         self.api_key = config['api_key']
         self.max_tokens = config.get('max_tokens', 1000)
         self.temperature = config.get('temperature', 0.7)
-        self.timeout = config.get('timeout', 30)
+        self.stream = config.get('stream', False)
         
-    async def get_trading_signal(self, market_data: Dict, portfolio: Dict) -> Dict:
+        # 预编码请求体静态部分, 每次请求只替换用户内容
+        extra = self._PAYLOAD_EXTRA_FIELDS
+        self._signal_payload = self._build_payload_template(self._get_system_prompt(), extra_fields=extra)
+        self._stream_payload = self._build_payload_template(self._get_system_prompt(), stream=True, extra_fields=extra)
+        self._batch_payload = self._build_payload_template(
+            self._get_system_prompt() + self._BATCH_INSTRUCTION, extra_fields=extra
+        )
+        
+    async def get_trading_signal(self, market_data: Dict, portfolio: Dict) -> TradingSignal:
         """获取OpenAI交易信号"""
         prompt = self._build_trading_prompt(market_data, portfolio)
+        if self.stream:
+            return await self._stream_trading_signal(prompt, market_data)
+            
+        ai_response = await self._chat(self._signal_payload, prompt)
+        if ai_response is None:
+            return self._get_fallback_signal()
+        return self.parse_trading_signal(ai_response, market_data)
+        
+    async def get_trading_signals_batch(self, items: List[Tuple[Dict, Dict]]) -> Dict[str, TradingSignal]:
+        """在一次请求中获取多个交易对的交易信号"""
+        if len(items) <= 1:
+            return await super().get_trading_signals_batch(items)
+            
+        ai_response = await self._chat(self._batch_payload, self._build_batch_prompt(items))
+        parsed = self.parse_ai_response(ai_response) if ai_response is not None else {}
+        return await self._collect_batch_signals(parsed, items)
         
+    async def _stream_trading_signal(self, prompt: str, market_data: Dict) -> TradingSignal:
+        """流式获取交易信号, 交易字段解析完成后立即中断生成"""
         try:
-            async with aiohttp.ClientSession() as session:
-                headers = {
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {self.api_key}"
-                }
-                
-                payload = {
-                    "model": self.model_name,
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": self._get_system_prompt()
-                        },
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    "max_tokens": self.max_tokens,
-                    "temperature": self.temperature,
-                    "response_format": {"type": "json_object"}
-                }
+            client = self._get_client()
+            body = self._render_payload(self._stream_payload, prompt)
+            
+            async with client.stream(
+                "POST",
+                self._endpoint,
+                headers=self._headers,
+                content=body,
+                timeout=self._request_timeout
+            ) as response:
                 
-                url = f"{self.base_url}/chat/completions"
-                async with session.post(
-                    url,
-                    headers=headers,
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=self.timeout)
-                ) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    self.logger.error("OpenAI API错误: %s - %s", response.status_code, response.text)
+                    return self._get_fallback_signal()
                     
-                    if response.status == 200:
-                        data = await response.json()
-                        ai_response = data['choices'][0]['message']['content']
-                        return self.parse_trading_signal(ai_response, market_data)
-                    else:
-                        error_text = await response.text()
-                        self.logger.error(f"OpenAI API错误: {response.status} - {error_text}")
-                        return self._get_fallback_signal()
+                text = ""
+                async for line in response.aiter_lines():
+                    # SSE 的 "data:" 后空格可选
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    # 部分兼容服务(如Azure)及开启用量统计时会发送 choices 为空的数据块
+                    choices = orjson.loads(data).get('choices')
+                    if not choices:
+                        continue
+                    delta = choices[0].get('delta', {}).get('content')
+                    if not delta:
+                        continue
                         
+                    scan_from = max(0, len(text) - 16)
+                    text += delta
+                    match = _REASONING_KEY.search(text, scan_from)
+                    if match:
+                        signal = self._parse_signal_prefix(text[:match.start()])
+                        if signal is not None:
+                            # 退出 stream 上下文时关闭响应, HTTP/2 下发送 RST_STREAM 中断生成
+                            return signal
+                            
+                return self.parse_trading_signal(text, market_data)
+                
         except Exception as e:
-            self.logger.error(f"OpenAI请求失败: {e}")
+            self.logger.error("OpenAI请求失败: %s", e)
             return self._get_fallback_signal()
             
+    def _parse_signal_prefix(self, prefix: str) -> Optional[TradingSignal]:
+        """解析reasoning之前的JSON前缀, 必需字段不全时返回None"""
+        try:
+            parsed = orjson.loads(prefix + "}")
+        except orjson.JSONDecodeError:
+            return None
+        if not isinstance(parsed, dict) or not all(k in parsed for k in _SIGNAL_FIELDS):
+            return None
+        signal = self._build_signal(parsed)
+        if signal is None:
+            return None
+        signal.reasoning = "流式提前返回, 未等待推理说明"
+        return signal
+        
     def _get_system_prompt(self) -> str:
         """获取系统提示词"""
-        return """你是一个专业的加密货币量化交易AI助手。请基于技术分析和风险管理给出交易建议。
-
-始终以JSON格式返回，包含:
-- action: "BUY", "SELL", "HOLD"
-- confidence: 0.0-1.0
-- position_size: 0.0-1.0
-- leverage: 1-20
-- stop_loss: 价格或百分比
-- take_profit: 价格或百分比
-- reasoning: 交易逻辑"""
+        return self._SYSTEM_PROMPT
     
     def _build_trading_prompt(self, market_data: Dict, portfolio: Dict) -> str:
         """构建交易提示词"""
         # 类似GLM4的实现
-        symbol = market_data.get('symbol', 'Unknown')
-        price = market_data.get('current_price', 0)
         indicators = market_data.get('indicators', {})
+        return self._format_prompt(
+            market_data.get('symbol', 'Unknown'),
+            market_data.get('current_price', 0),
+            market_data.get('price_change_24h', 0),
+            indicators.get('rsi', 'N/A'),
+            indicators.get('macd', 'N/A'),
+            indicators.get('ma20', 'N/A'),
+            indicators.get('bb_upper', 'N/A'),
+            indicators.get('bb_middle', 'N/A'),
+            indicators.get('bb_lower', 'N/A'),
+            portfolio.get('position_side', '无'),
+            portfolio.get('position_size', 0)
+        )
         
-        prompt = f"""
-分析 {symbol} 交易对:
-
-价格: ${price:,.2f}
-24h变化: {market_data.get('price_change_24h', 0):.2f}%
-
-技术指标:
-- RSI(14): {indicators.get('rsi', 'N/A')}
-- MACD: {indicators.get('macd', 'N/A')}
-- 移动平均线: MA20={indicators.get('ma20', 'N/A')}
-- 布林带: 上{indicators.get('bb_upper', 'N/A')} 中{indicators.get('bb_middle', 'N/A')} 下{indicators.get('bb_lower', 'N/A')}
-
-当前持仓: {portfolio.get('position_side', '无')}
-仓位大小: {portfolio.get('position_size', 0):.4f}
-
-请给出交易建议。
-"""
-        return prompt
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _format_prompt(symbol, price, change_24h, rsi, macd, ma20, bb_upper, bb_middle, bb_lower,
+                       side, size) -> str:
+        """格式化交易提示词(按行情字段缓存)"""
+        values = (
+            str(symbol), f"{price:,.2f}", f"{change_24h:.2f}",
+            str(rsi), str(macd), str(ma20), str(bb_upper), str(bb_middle), str(bb_lower),
+            str(side), f"{size:.4f}"
+        )
+        segments = OpenAIClient._PROMPT_SEGMENTS
+        return "".join(itertools.chain.from_iterable(zip(segments, values))) + segments[-1]
         
-    def parse_trading_signal(self, ai_response: str, market_data: Dict) -> Dict:
+    def parse_trading_signal(self, ai_response: str, market_data: Dict) -> TradingSignal:
         """解析交易信号"""
         try:
-            signal = json.loads(ai_response)
-            
-            # 验证必需字段
-            required_fields = ['action', 'confidence', 'position_size']
-            for field in required_fields:
-                if field not in signal:
-                    signal[field] = self._get_default_value(field)
-                    
-            # 数据清理
-            signal['confidence'] = max(0.0, min(1.0, float(signal['confidence'])))
-            signal['position_size'] = max(0.0, min(1.0, float(signal['position_size'])))
-            signal['leverage'] = max(1, min(20, int(signal.get('leverage', 1))))
-            signal['source'] = 'openai'
-            
-            return signal
-            
-        except json.JSONDecodeError as e:
-            self.logger.error(f"OpenAI响应JSON解析错误: {e}")
+            signal = self._build_signal(orjson.loads(ai_response))
+        except orjson.JSONDecodeError as e:
+            self.logger.error("OpenAI响应JSON解析错误: %s", e)
             return self._get_fallback_signal()
+        return signal if signal is not None else self._get_fallback_signal()
             
-    def _get_default_value(self, field: str):
-        """获取字段默认值"""
-        defaults = {
-            'action': 'HOLD',
-            'confidence': 0.5,
-            'position_size': 0.0,
-            'leverage': 1
-        }
-        return defaults.get(field, None)
-        
-    def _get_fallback_signal(self) -> Dict:
+    def _get_fallback_signal(self) -> TradingSignal:
         """获取降级信号"""
-        return {
-            "action": "HOLD",
-            "confidence": 0.3,
-            "position_size": 0.0,
-            "leverage": 1,
-            "stop_loss": None,
-            "take_profit": None,
-            "reasoning": "OpenAI服务暂时不可用",
-            "source": "fallback"
-        }
+        return TradingSignal(reasoning="OpenAI服务暂时不可用", source="fallback")
         
     async def analyze_market(self, symbol: str, indicators: Dict) -> Dict:
         """分析市场 - 简化实现"""
@@ -0,0 +1,46 @@
+from typing import Any, Dict, Optional
+
+
+class TradingSignal:
+    """AI交易信号, 使用固定槽位存储, 仅在对外接口处转换为dict"""
+
+    __slots__ = (
+        'action',
+        'confidence',
+        'position_size',
+        'leverage',
+        'stop_loss',
+        'take_profit',
+        'reasoning',
+        'source'
+    )
+
+    def __init__(self, action: str = 'HOLD', confidence: float = 0.3, position_size: float = 0.0,
+                 leverage: int = 1, stop_loss: Optional[Any] = None, take_profit: Optional[Any] = None,
+                 reasoning: str = '', source: str = 'default'):
+        self.action = action
+        self.confidence = confidence
+        self.position_size = position_size
+        self.leverage = leverage
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.reasoning = reasoning
+        self.source = source
+
+    def update(self, fields: Dict) -> 'TradingSignal':
+        """用AI响应中的已知字段覆盖当前值, 忽略其他字段"""
+        for key in self.__slots__:
+            if key in fields:
+                setattr(self, key, fields[key])
+        return self
+
+    def copy(self) -> 'TradingSignal':
+        """复制信号"""
+        return TradingSignal(*(getattr(self, key) for key in self.__slots__))
+
+    def to_dict(self) -> Dict:
+        """转换为dict"""
+        return {key: getattr(self, key) for key in self.__slots__}
+
+    def __repr__(self) -> str:
+        return f"TradingSignal({self.to_dict()})"
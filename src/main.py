@@ -4,6 +4,8 @@ import asyncio
 import signal
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Optional
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
@@ -21,15 +23,34 @@ import uvicorn
 
 load_dotenv()
 
+class _EmbeddedServer(uvicorn.Server):
+    """嵌入应用事件循环运行的uvicorn服务, 信号由应用统一处理"""
+    
+    def install_signal_handlers(self):
+        # uvicorn 默认会覆盖应用注册的 SIGINT/SIGTERM 处理器
+        pass
+
+# uvloop 仅支持 POSIX 平台, Windows 下使用默认事件循环
+USE_UVLOOP = sys.platform != 'win32'
+
 class QuantTradingApp:
     def __init__(self):
         self.config = ConfigLoader.load_config()
         self.logger = setup_logging(self.config)
         self.running = False
         self.start_time = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._periodic_tasks = []
+        self._web_server: Optional[uvicorn.Server] = None
+        self._web_task: Optional[asyncio.Task] = None
+        
+        # 同步的交易所调用在该线程池中执行, 避免阻塞事件循环
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="binance")
         
         # 初始化组件
         self.components = {}
+        self._component_names = ()
+        self._component_status = {}
         self.setup_components()
         
     def setup_components(self):
@@ -72,6 +93,10 @@ class QuantTradingApp:
                 self.components['ai_manager']  # 新增AI管理器参数
             )
             
+            # 组件列表初始化后不再变化, 状态接口直接复用
+            self._component_names = tuple(self.components)
+            self._component_status = {name: "active" for name in self._component_names}
+            
             self.logger.info("所有组件初始化完成")
             
         except Exception as e:
@@ -81,8 +106,21 @@ class QuantTradingApp:
     async def start(self):
         """启动交易应用"""
         self.logger.info("🚀 启动币安量化交易应用...")
-        self.start_time = time.time()
+        self.start_time = time.monotonic()
         self.running = True
+        self._stop_event = asyncio.Event()
+        
+        # 作为默认线程池, 各组件的 run_in_executor(None, ...) 共用; asyncio.run 退出时关闭
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(self._executor)
+        
+        # 在事件循环中注册信号处理器
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, self.request_stop)
+            except NotImplementedError:
+                # Windows 不支持 add_signal_handler, 由 KeyboardInterrupt 处理
+                pass
         
         try:
             # 启动通知
@@ -101,8 +139,15 @@ class QuantTradingApp:
             if self.config['web_ui']['enabled']:
                 await self.start_web_ui()
                 
+            # 定期健康检查和报告
+            self._periodic_tasks = [
+                asyncio.create_task(self._periodic(30, self.health_check)),
+                asyncio.create_task(self._periodic(300, self.periodic_report))
+            ]
+                
             # 主循环
             await self.main_loop()
+            await self.stop()
             
         except Exception as e:
             self.logger.error(f"应用启动失败: {e}")
@@ -116,40 +161,51 @@ class QuantTradingApp:
                 app, 
                 host=self.config['web_ui']['host'],
                 port=self.config['web_ui']['port'],
-                log_level="info"
+                log_level="info",
+                loop="uvloop" if USE_UVLOOP else "asyncio",
+                http="httptools"
             )
-            server = uvicorn.Server(config)
+            self._web_server = _EmbeddedServer(config)
             # 在后台运行Web服务器
-            asyncio.create_task(server.serve())
+            self._web_task = asyncio.create_task(self._web_server.serve())
             self.logger.info(f"Web UI 启动在 {self.config['web_ui']['host']}:{self.config['web_ui']['port']}")
         except Exception as e:
             self.logger.error(f"Web UI 启动失败: {e}")
             
     async def main_loop(self):
-        """主循环"""
-        iteration = 0
+        """主循环: 等待停止信号, 定期任务由独立协程调度"""
+        await self._stop_event.wait()
+        
+    def request_stop(self):
+        """请求停止应用, 由事件循环的信号处理器调用"""
+        if self._stop_event is not None:
+            self._stop_event.set()
+        if self._web_server is not None:
+            self._web_server.should_exit = True
+            
+    async def _periodic(self, interval: float, callback: Callable[[], Awaitable]):
+        """按绝对截止时间周期执行任务, 执行耗时不会累计成漂移"""
+        loop = asyncio.get_running_loop()
+        next_deadline = loop.time()
         while self.running:
+            next_deadline += interval
             try:
-                # 定期健康检查
-                if iteration % 30 == 0:  # 每30次循环检查一次
-                    await self.health_check()
-                    
-                # 定期报告
-                if iteration % 300 == 0:  # 每300次循环报告一次
-                    await self.periodic_report()
-                    
-                iteration += 1
-                await asyncio.sleep(1)
-                
+                await callback()
             except Exception as e:
-                self.logger.error(f"主循环错误: {e}")
-                await asyncio.sleep(5)
+                self.logger.error(f"定期任务执行错误: {e}")
                 
+            # 执行超过一个周期时跳过错过的截止时间
+            now = loop.time()
+            if next_deadline < now:
+                next_deadline = now
+            await asyncio.sleep(next_deadline - now)
+            
     async def health_check(self):
         """健康检查"""
         try:
             # 检查币安连接
-            balance = self.components['binance'].get_balance()
+            loop = asyncio.get_running_loop()
+            balance = await loop.run_in_executor(self._executor, self.components['binance'].get_balance)
             if not balance:
                 self.logger.warning("币安连接检查失败")
                 
@@ -178,6 +234,20 @@ class QuantTradingApp:
         """停止交易应用"""
         self.logger.info("🛑 停止交易应用...")
         self.running = False
+        if self._stop_event is not None:
+            self._stop_event.set()
+        for task in self._periodic_tasks:
+            task.cancel()
+        self._periodic_tasks = []
+        
+        # 停止Web UI并等待服务关闭
+        if self._web_server is not None:
+            self._web_server.should_exit = True
+            try:
+                await self._web_task
+            except Exception as e:
+                self.logger.error(f"停止Web UI时出错: {e}")
+            self._web_server = None
         
         # 停止所有组件
         for name, component in reversed(self.components.items()):
@@ -190,7 +260,7 @@ class QuantTradingApp:
                 
         # 发送停止通知
         try:
-            runtime = time.time() - self.start_time
+            runtime = time.monotonic() - self.start_time
             await self.components['notifier'].send_message(
                 f"🔴 交易机器人已停止\n运行时间: {runtime:.0f}秒"
             )
@@ -201,22 +271,18 @@ class QuantTradingApp:
         """获取应用状态"""
         return {
             "running": self.running,
-            "uptime": time.time() - self.start_time if self.start_time else 0,
-            "components": {name: "active" for name in self.components.keys()}
+            "uptime": time.monotonic() - self.start_time if self.start_time else 0,
+            "components": self._component_status
         }
 
-# 信号处理
-def signal_handler(signum, frame):
-    """处理系统信号"""
-    asyncio.create_task(app.stop())
-
 if __name__ == "__main__":
     app = QuantTradingApp()
     
-    # 注册信号处理器
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
-    
+    # 使用 uvloop 替换默认事件循环
+    if USE_UVLOOP:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        
     # 启动应用
     try:
         asyncio.run(app.start())
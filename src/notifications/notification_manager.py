@@ -1,5 +1,6 @@
+import asyncio
 import logging
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 from .telegram_notifier import TelegramNotifier
 from .email_notifier import EmailNotifier
 
@@ -9,6 +10,14 @@ class NotificationManager:
         self.logger = logging.getLogger(__name__)
         self.notifiers = []
         
+        # 消息批量发送设置
+        batch_config = config['notifications'].get('batch', {})
+        self.max_batch = batch_config.get('max_batch', 20)
+        self.max_wait = batch_config.get('max_wait_ms', 500) / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._closed = False
+        
         self.setup_notifiers()
         
     def setup_notifiers(self):
@@ -24,13 +33,81 @@ class NotificationManager:
         self.logger.info(f"初始化 {len(self.notifiers)} 个通知器")
         
     async def send_message(self, message: str, event_type: str = "info"):
-        """发送消息"""
-        for notifier in self.notifiers:
+        """发送消息, 消息先入队, 由后台任务合并后发送"""
+        if not self.notifiers:
+            return
+        if self._closed:
+            await self._dispatch(message, event_type)
+            return
+            
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._batch_worker())
+        self._queue.put_nowait((message, event_type, asyncio.get_running_loop().time()))
+        
+    async def _batch_worker(self):
+        """合并队列中的消息: 攒够 max_batch 条或首条入队满 max_wait 后发送"""
+        loop = asyncio.get_running_loop()
+        while True:
+            first = await self._queue.get()
+            batch = [first]
+            deadline = first[2] + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+                    
             try:
-                if notifier.should_notify(event_type):
-                    await notifier.send(message, event_type)
+                await self._send_batch(batch)
             except Exception as e:
-                self.logger.error(f"发送通知失败 {notifier.__class__.__name__}: {e}")
+                self.logger.error(f"批量发送通知失败: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+                    
+    async def _send_batch(self, batch: List[Tuple[str, str, float]]):
+        """按事件类型合并消息后发送"""
+        grouped: Dict[str, List[str]] = {}
+        for message, event_type, _ in batch:
+            grouped.setdefault(event_type, []).append(message)
+            
+        for event_type, messages in grouped.items():
+            await self._dispatch("\n---\n".join(messages), event_type)
+            
+    async def flush(self):
+        """等待队列中的消息全部发送"""
+        if self._queue is not None:
+            await self._queue.join()
+            
+    async def stop(self):
+        """发送剩余消息并停止后台任务, 之后的消息直接发送"""
+        await self.flush()
+        self._closed = True
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+            
+    async def _dispatch(self, message: str, event_type: str):
+        """各通知器并发发送"""
+        targets = [n for n in self.notifiers if n.should_notify(event_type)]
+        if not targets:
+            return
+            
+        results = await asyncio.gather(
+            *(n.send(message, event_type) for n in targets),
+            return_exceptions=True
+        )
+        for notifier, result in zip(targets, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"发送通知失败 {notifier.__class__.__name__}: {result}")
                 
     async def send_alert(self, title: str, message: str, level: str = "warning"):
         """发送警报"""
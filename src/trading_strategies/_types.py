@@ -0,0 +1,20 @@
+from typing import List, NamedTuple
+
+
+class MarketSnapshot(NamedTuple):
+    """单个交易对的市场数据快照"""
+    current_price: float
+    high_24h: float
+    low_24h: float
+    volume_24h: float
+    price_change_24h: float
+    ohlcv: List
+
+
+class PortfolioSnapshot(NamedTuple):
+    """单个交易对的持仓快照, 无持仓时使用默认值"""
+    position_side: str = 'none'
+    position_size: float = 0.0
+    entry_price: float = 0.0
+    unrealized_pnl: float = 0.0
+    available_balance: float = 0.0
@@ -1,12 +1,19 @@
 import asyncio
 import logging
-from typing import Dict
+from typing import ClassVar, Dict, Optional, Tuple
 from .base_strategy import BaseStrategy
+from ._types import MarketSnapshot, PortfolioSnapshot
 from ai.ai_manager import AIManager
 
+# 账户余额的复用时长(秒)
+BALANCE_TTL = 1.0
+
 class AITradingStrategy(BaseStrategy):
     """AI交易策略"""
     
+    # 由 StrategyManager 在构造时传入 ai_manager
+    _REQUIRES_AI_MANAGER: ClassVar[bool] = True
+    
     def __init__(self, config, binance_client, position_manager, risk_manager, database, ai_manager: AIManager):
         super().__init__(config, binance_client, position_manager, risk_manager, database)
         self.ai_manager = ai_manager
@@ -16,6 +23,8 @@ class AITradingStrategy(BaseStrategy):
         self.ai_config = config.get('trading_ai', {})
         self.decision_interval = self.ai_config.get('decision_interval', 300)
         self.last_decision_time = 0
+        # (请求发起时间, 余额请求的Future), 并发调用共享同一次请求
+        self._balance_cache: Optional[Tuple[float, asyncio.Future]] = None
         
     async def execute(self, symbol: str):
         """执行AI交易策略"""
@@ -26,16 +35,18 @@ class AITradingStrategy(BaseStrategy):
             return
             
         try:
-            # 获取市场数据
-            market_data = await self.get_market_data(symbol)
-            if not market_data:
+            # 并发获取市场数据和当前持仓
+            market_data, portfolio = await asyncio.gather(
+                self.get_market_data(symbol),
+                self.get_portfolio_data(symbol)
+            )
+            if market_data is None:
                 return
-                
-            # 获取当前持仓
-            portfolio = await self.get_portfolio_data(symbol)
             
             # 获取AI交易信号
-            ai_signal = await self.ai_manager.get_trading_signal(symbol, market_data, portfolio)
+            ai_signal = await self.ai_manager.get_trading_signal(
+                symbol, market_data._asdict(), portfolio._asdict()
+            )
             
             # 执行AI信号
             await self.execute_ai_signal(symbol, ai_signal, portfolio)
@@ -45,48 +56,72 @@ class AITradingStrategy(BaseStrategy):
         except Exception as e:
             self.logger.error(f"AI策略执行失败 {symbol}: {e}")
             
-    async def get_market_data(self, symbol: str) -> Dict:
+    async def get_market_data(self, symbol: str) -> Optional[MarketSnapshot]:
         """获取市场数据"""
         try:
-            # 获取K线数据
-            ohlcv = self.binance_client.get_ohlcv(symbol, '1h', 100)
+            # 并发获取K线和ticker数据
+            ohlcv, ticker = await asyncio.gather(
+                self._run_blocking(self.binance_client.get_ohlcv, symbol, '1h', 100),
+                self._run_blocking(self.binance_client.get_ticker, symbol)
+            )
             if not ohlcv:
-                return {}
-                
-            # 获取ticker数据
-            ticker = self.binance_client.get_ticker(symbol)
+                return None
             
-            return {
-                'current_price': ticker.get('last', 0),
-                'high_24h': ticker.get('high', 0),
-                'low_24h': ticker.get('low', 0),
-                'volume_24h': ticker.get('baseVolume', 0),
-                'price_change_24h': ticker.get('percentage', 0),
-                'ohlcv': ohlcv
-            }
+            return MarketSnapshot(
+                current_price=ticker.get('last', 0),
+                high_24h=ticker.get('high', 0),
+                low_24h=ticker.get('low', 0),
+                volume_24h=ticker.get('baseVolume', 0),
+                price_change_24h=ticker.get('percentage', 0),
+                ohlcv=ohlcv
+            )
             
         except Exception as e:
             self.logger.error(f"获取市场数据失败 {symbol}: {e}")
-            return {}
+            return None
             
-    async def get_portfolio_data(self, symbol: str) -> Dict:
+    async def _run_blocking(self, func, *args):
+        """在线程池中执行同步的交易所调用, 避免阻塞事件循环"""
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+        
+    async def get_portfolio_data(self, symbol: str) -> PortfolioSnapshot:
         """获取持仓数据"""
         try:
-            position = self.position_manager.get_position(symbol)
-            balance = self.binance_client.get_balance()
+            position, balance = await asyncio.gather(
+                self._run_blocking(self.position_manager.get_position, symbol),
+                self.get_balance_cached()
+            )
             
-            return {
-                'position_side': position.get('side', 'none'),
-                'position_size': position.get('size', 0),
-                'entry_price': position.get('entry_price', 0),
-                'unrealized_pnl': position.get('unrealized_pnl', 0),
-                'available_balance': balance.get('free', {}).get('USDT', 0)
-            }
+            return PortfolioSnapshot(
+                position_side=position.get('side', 'none'),
+                position_size=position.get('size', 0),
+                entry_price=position.get('entry_price', 0),
+                unrealized_pnl=position.get('unrealized_pnl', 0),
+                available_balance=balance.get('free', {}).get('USDT', 0)
+            )
         except Exception as e:
             self.logger.error(f"获取持仓数据失败 {symbol}: {e}")
-            return {}
+            return PortfolioSnapshot()
+            
+    async def get_balance_cached(self) -> Dict:
+        """获取账户余额, 短时间内的重复或并发请求共享同一次调用"""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if self._balance_cache is not None and now - self._balance_cache[0] < BALANCE_TTL:
+            return await asyncio.shield(self._balance_cache[1])
             
-    async def execute_ai_signal(self, symbol: str, ai_signal: Dict, portfolio: Dict):
+        future = loop.run_in_executor(None, self.binance_client.get_balance)
+        cache_entry = (now, future)
+        self._balance_cache = cache_entry
+        try:
+            return await asyncio.shield(future)
+        except Exception:
+            # 请求失败时不缓存, 下次调用重新请求
+            if self._balance_cache is cache_entry:
+                self._balance_cache = None
+            raise
+        
+    async def execute_ai_signal(self, symbol: str, ai_signal: Dict, portfolio: PortfolioSnapshot):
         """执行AI信号"""
         action = ai_signal.get('action', 'HOLD')
         confidence = ai_signal.get('confidence', 0)
@@ -97,8 +132,8 @@ class AITradingStrategy(BaseStrategy):
         if action == 'HOLD':
             return
             
-        current_position = portfolio.get('position_side', 'none')
-        current_size = portfolio.get('position_size', 0)
+        current_position = portfolio.position_side
+        current_size = portfolio.position_size
         
         try:
             if action == 'BUY':
@@ -1,15 +1,22 @@
 import asyncio
 import logging
-from typing import Dict, List
+from typing import Callable, ClassVar, Dict, List, Optional, Tuple, Type
 import importlib
 
 from .base_strategy import BaseStrategy
-from .rsi_strategy import RSIStrategy
-from .ma_crossover_strategy import MACrossoverStrategy
-from .bollinger_bands_strategy import BollingerBandsStrategy
-from .ai_trading_strategy import AITradingStrategy  # 新增导入
 
 class StrategyManager:
+    # 策略名 -> (模块路径, 类名), 仅在策略启用时才导入对应模块及其依赖
+    _STRATEGY_MODULES: ClassVar[Dict[str, Tuple[str, str]]] = {
+        'rsi_strategy': ('.rsi_strategy', 'RSIStrategy'),
+        'ma_crossover': ('.ma_crossover_strategy', 'MACrossoverStrategy'),
+        'bollinger_bands': ('.bollinger_bands_strategy', 'BollingerBandsStrategy'),
+        'ai_trading': ('.ai_trading_strategy', 'AITradingStrategy')
+    }
+    
+    # 已导入的策略类, 插件策略可通过 register 装饰器直接加入
+    _STRATEGY_CLASSES: ClassVar[Dict[str, Type[BaseStrategy]]] = {}
+    
     def __init__(self, config, binance_client, position_manager, risk_manager, database, ai_manager):  # 新增ai_manager参数
         self.config = config
         self.binance_client = binance_client
@@ -20,88 +27,43 @@ class StrategyManager:
         self.logger = logging.getLogger(__name__)
         
         self.strategies: Dict[str, BaseStrategy] = {}
+        # 已加载策略名, 在 load_strategy 中更新
+        self.strategy_names: Tuple[str, ...] = ()
         self.running = False
-        
-    async def load_strategy(self, strategy_name: str):
-        """加载策略"""
-        try:
-            if strategy_name == 'ai_trading':
-                strategy_class = AITradingStrategy
-            else:
-                strategy_class = self.get_strategy_class(strategy_name)
-                
-            if not strategy_class:
-                self.logger.error(f"未知策略: {strategy_name}")
-                return
-                
-            strategy_config = self.config['strategies'].get(strategy_name, {})
-            
-            if strategy_name == 'ai_trading':
-                strategy = strategy_class(
-                    strategy_config,
-                    self.binance_client,
-                    self.position_manager,
-                    self.risk_manager,
-                    self.database,
-                    self.ai_manager  # 传入AI管理器
-                )
-            else:
-                strategy = strategy_class(
-                    strategy_config,
-                    self.binance_client,
-                    self.position_manager,
-                    self.risk_manager,
-                    self.database
-                )
-            
-            self.strategies[strategy_name] = strategy
-            self.logger.info(f"策略加载成功: {strategy_name}")
-            
-        except Exception as e:
-            self.logger.error(f"加载策略 {strategy_name} 失败: {e}")
-            
-    def get_strategy_class(self, strategy_name: str):
-        """获取策略类"""
-        strategy_map = {
-            'rsi_strategy': RSIStrategy,
-            'ma_crossover': MACrossoverStrategy,
-            'bollinger_bands': BollingerBandsStrategy,
-            'ai_trading': AITradingStrategy  # 新增
-        }
-        return strategy_map.get(strategy_name)
-
-class StrategyManager:
-    def __init__(self, config, binance_client, position_manager, risk_manager, database):
-        self.config = config
-        self.binance_client = binance_client
-        self.position_manager = position_manager
-        self.risk_manager = risk_manager
-        self.database = database
-        self.logger = logging.getLogger(__name__)
-        
-        self.strategies: Dict[str, BaseStrategy] = {}
-        self.running = False
+        self._tasks: List[asyncio.Task] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._stop_event: Optional[asyncio.Event] = None
         
     async def start(self):
         """启动所有策略"""
         self.logger.info("启动交易策略管理器...")
         self.running = True
+        self._stop_event = asyncio.Event()
+        # 限制同时执行的策略数量, 避免瞬间打满交易所限频
+        self._semaphore = asyncio.Semaphore(
+            self.config['trading'].get('max_concurrent_strategies', 8)
+        )
         
         # 加载启用的策略
         enabled_strategies = self.config['strategies']['enabled']
         for strategy_name in enabled_strategies:
             await self.load_strategy(strategy_name)
             
-        # 启动策略任务
-        tasks = []
-        for symbol in self.config['trading']['symbols']:
-            for strategy in self.strategies.values():
-                task = asyncio.create_task(
-                    self.run_strategy_for_symbol(strategy, symbol)
-                )
-                tasks.append(task)
+        # 每个策略一个任务, 任务内并发处理所有交易对
+        self._tasks = [
+            asyncio.create_task(self.run_strategy(strategy))
+            for strategy in self.strategies.values()
+        ]
                 
-        self.logger.info(f"启动 {len(tasks)} 个策略任务")
+        self.logger.info(f"启动 {len(self._tasks)} 个策略任务")
+        
+    @classmethod
+    def register(cls, name: str) -> Callable[[Type[BaseStrategy]], Type[BaseStrategy]]:
+        """注册策略类的装饰器"""
+        def decorator(strategy_class: Type[BaseStrategy]) -> Type[BaseStrategy]:
+            cls._STRATEGY_CLASSES[name] = strategy_class
+            return strategy_class
+        return decorator
         
     async def load_strategy(self, strategy_name: str):
         """加载策略"""
@@ -112,50 +74,82 @@ class StrategyManager:
                 return
                 
             strategy_config = self.config['strategies'].get(strategy_name, {})
+            
+            # 需要AI管理器的策略额外传入 ai_manager
+            extra_kwargs = {}
+            if getattr(strategy_class, '_REQUIRES_AI_MANAGER', False):
+                extra_kwargs['ai_manager'] = self.ai_manager
+                
             strategy = strategy_class(
                 strategy_config,
                 self.binance_client,
                 self.position_manager,
                 self.risk_manager,
-                self.database
+                self.database,
+                **extra_kwargs
             )
             
             self.strategies[strategy_name] = strategy
+            self.strategy_names = tuple(self.strategies)
             self.logger.info(f"策略加载成功: {strategy_name}")
             
         except Exception as e:
             self.logger.error(f"加载策略 {strategy_name} 失败: {e}")
             
-    def get_strategy_class(self, strategy_name: str):
-        """获取策略类"""
-        strategy_map = {
-            'rsi_strategy': RSIStrategy,
-            'ma_crossover': MACrossoverStrategy,
-            'bollinger_bands': BollingerBandsStrategy
-        }
-        return strategy_map.get(strategy_name)
+    def get_strategy_class(self, strategy_name: str) -> Optional[Type[BaseStrategy]]:
+        """获取策略类, 首次使用时导入策略模块"""
+        strategy_class = self._STRATEGY_CLASSES.get(strategy_name)
+        if strategy_class is None:
+            location = self._STRATEGY_MODULES.get(strategy_name)
+            if location is None:
+                return None
+            module_path, class_name = location
+            module = importlib.import_module(module_path, __package__)
+            strategy_class = getattr(module, class_name)
+            self._STRATEGY_CLASSES[strategy_name] = strategy_class
+        return strategy_class
         
-    async def run_strategy_for_symbol(self, strategy: BaseStrategy, symbol: str):
-        """为指定交易对运行策略"""
-        self.logger.info(f"为 {symbol} 启动策略 {strategy.__class__.__name__}")
+    async def run_strategy(self, strategy: BaseStrategy):
+        """运行策略, 每个周期并发执行所有交易对"""
+        symbols = self.config['trading']['symbols']
+        strategy_name = strategy.__class__.__name__
+        self.logger.info(f"为 {len(symbols)} 个交易对启动策略 {strategy_name}")
         
         while self.running:
             try:
                 # 检查交易时间
                 if not await self.is_trading_hours():
-                    await asyncio.sleep(60)
+                    await self._wait_or_stop(60)
                     continue
                     
                 # 执行策略
-                await strategy.execute(symbol)
+                results = await asyncio.gather(
+                    *(self._execute_bounded(strategy, symbol) for symbol in symbols),
+                    return_exceptions=True
+                )
+                for symbol, result in zip(symbols, results):
+                    if isinstance(result, Exception):
+                        self.logger.error(f"{symbol} 策略执行错误: {result}")
                 
                 # 策略特定的间隔
-                await asyncio.sleep(strategy.get_interval())
+                await self._wait_or_stop(strategy.get_interval())
                 
             except Exception as e:
-                self.logger.error(f"{symbol} 策略执行错误: {e}")
-                await asyncio.sleep(60)
+                self.logger.error(f"{strategy_name} 策略执行错误: {e}")
+                await self._wait_or_stop(60)
                 
+    async def _wait_or_stop(self, timeout: float):
+        """等待下一个周期, 收到停止请求时立即返回"""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+            
+    async def _execute_bounded(self, strategy: BaseStrategy, symbol: str):
+        """在并发限制内执行策略"""
+        async with self._semaphore:
+            await strategy.execute(symbol)
+            
     async def is_trading_hours(self) -> bool:
         """检查是否在交易时间内"""
         # 实现交易时间检查逻辑
@@ -166,6 +160,13 @@ class StrategyManager:
         self.logger.info("停止策略管理器...")
         self.running = False
         
+        # 只打断周期间的等待, 正在执行的策略周期跑完后任务自行退出,
+        # 避免在开仓和设置止损止盈之间被取消
+        if self._stop_event is not None:
+            self._stop_event.set()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        
     async def get_performance_stats(self) -> Dict:
         """获取性能统计"""
         # 实现性能统计逻辑
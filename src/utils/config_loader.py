@@ -1,15 +1,36 @@
 import yaml
 import os
+import functools
 from typing import Dict, Any
 import logging
 
+# 优先使用 libyaml 的 C 解析器
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# 必要配置项的键路径
+_REQUIRED_PATHS = (
+    ("binance", "api_key"),
+    ("binance", "secret_key"),
+    ("trading", "symbols"),
+    ("trading", "total_capital"),
+)
+
 class ConfigLoader:
     @staticmethod
     def load_config(config_path: str = "config/config.yaml") -> Dict[str, Any]:
-        """加载和验证配置"""
+        """加载和验证配置, 文件未修改时返回缓存结果(调用方不应修改返回值)"""
+        return ConfigLoader._load_config_cached(config_path, os.path.getmtime(config_path))
+        
+    @staticmethod
+    @functools.lru_cache(maxsize=4)
+    def _load_config_cached(config_path: str, mtime: float) -> Dict[str, Any]:
+        """按(路径, 修改时间)缓存的配置加载"""
         try:
             with open(config_path, 'r', encoding='utf-8') as file:
-                config = yaml.safe_load(file)
+                config = yaml.load(file, Loader=SafeLoader)
                 
             # 环境变量替换
             config = ConfigLoader._replace_env_vars(config)
@@ -26,12 +47,25 @@ class ConfigLoader:
             
     @staticmethod
     def _replace_env_vars(config: Dict) -> Dict:
-        """递归替换环境变量"""
+        """递归替换环境变量, 容器原地修改"""
         if isinstance(config, dict):
-            return {k: ConfigLoader._replace_env_vars(v) for k, v in config.items()}
+            for k, v in config.items():
+                new_value = ConfigLoader._replace_env_vars(v)
+                if new_value is not v:
+                    config[k] = new_value
+            return config
         elif isinstance(config, list):
-            return [ConfigLoader._replace_env_vars(item) for item in config]
-        elif isinstance(config, str) and config.startswith("${") and config.endswith("}"):
+            for i, item in enumerate(config):
+                new_item = ConfigLoader._replace_env_vars(item)
+                if new_item is not item:
+                    config[i] = new_item
+            return config
+        elif isinstance(config, str):
+            # 绝大多数配置值不含占位符, 直接返回
+            if "${" not in config:
+                return config
+            if not (config.startswith("${") and config.endswith("}")):
+                return config
             env_var = config[2:-1]
             default = None
             if ":-" in env_var:
@@ -43,17 +77,8 @@ class ConfigLoader:
     @staticmethod
     def _validate_config(config: Dict):
         """验证配置完整性"""
-        required_keys = [
-            'binance.api_key',
-            'binance.secret_key',
-            'trading.symbols',
-            'trading.total_capital'
-        ]
-        
-        for key_path in required_keys:
-            keys = key_path.split('.')
-            current = config
-            for key in keys:
-                if key not in current:
-                    raise ValueError(f"缺少必要配置: {key_path}")
-                current = current[key]
+        for path in _REQUIRED_PATHS:
+            try:
+                functools.reduce(dict.__getitem__, path, config)
+            except (KeyError, TypeError):
+                raise ValueError(f"缺少必要配置: {'.'.join(path)}")
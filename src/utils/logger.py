@@ -0,0 +1,55 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+from typing import Dict, Optional
+
+# 后台写日志的监听线程
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def setup_logging(config: Dict) -> logging.Logger:
+    """配置日志: 调用方只把日志记录放入队列, 格式化和写文件在后台线程完成"""
+    global _listener
+    log_config = config.get('logging', {})
+    level = getattr(logging, str(log_config.get('level', 'INFO')).upper(), logging.INFO)
+    log_file = log_config.get('file', 'logs/trading.log')
+    formatter = logging.Formatter(
+        log_config.get('format', '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    )
+    
+    # 实际输出的处理器, 只在监听线程中使用
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+        handlers.append(logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=log_config.get('max_bytes', 10 * 1024 * 1024),
+            backupCount=log_config.get('backup_count', 5),
+            encoding='utf-8'
+        ))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        
+    # 重复调用时先停止旧的监听线程
+    if _listener is not None:
+        _listener.stop()
+    else:
+        atexit.register(stop_logging)
+        
+    log_queue = queue.Queue(-1)
+    root_logger = logging.getLogger()
+    root_logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+    root_logger.setLevel(level)
+    
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    
+    return logging.getLogger('quant_trading')
+
+def stop_logging():
+    """停止监听线程, 写出队列中剩余的日志"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
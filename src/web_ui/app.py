@@ -1,98 +1,130 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import APIRouter, FastAPI, Depends, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
+from functools import lru_cache
+import orjson
 import secrets
-from typing import Dict
+from typing import Dict, Tuple
 
 security = HTTPBasic()
+router = APIRouter()
 
-def create_web_app(trading_app):
-    app = FastAPI(title="Binance Quant Trading", version="2.0.0")
-    
-    # CORS 中间件
-    app.add_middleware(
-        CORSMiddleware,
-        allow_origins=["*"],
-        allow_credentials=True,
-        allow_methods=["*"],
-        allow_headers=["*"],
+# 路由在模块级注册, 通过 request.app.state.trading_app 访问交易应用
+
+def get_trading_app(request: Request):
+    """获取交易应用实例"""
+    return request.app.state.trading_app
+
+# 认证依赖
+def authenticate(request: Request, credentials: HTTPBasicCredentials = Depends(security)):
+    state = request.app.state
+    correct_username = secrets.compare_digest(
+        credentials.username.encode('utf-8'),
+        state.expected_username
     )
-    
-    # 认证依赖
-    def authenticate(credentials: HTTPBasicCredentials = Depends(security)):
-        correct_username = secrets.compare_digest(
-            credentials.username, 
-            trading_app.config['web_ui']['username']
-        )
-        correct_password = secrets.compare_digest(
-            credentials.password,
-            trading_app.config['web_ui']['password']
+    correct_password = secrets.compare_digest(
+        credentials.password.encode('utf-8'),
+        state.expected_password
+    )
+    if not (correct_username and correct_password):
+        raise HTTPException(
+            status_code=401,
+            detail="认证失败",
+            headers={"WWW-Authenticate": "Basic"},
         )
-        if not (correct_username and correct_password):
-            raise HTTPException(
-                status_code=401,
-                detail="认证失败",
-                headers={"WWW-Authenticate": "Basic"},
-            )
-        return credentials.username
-    
-    @app.get("/")
-    async def root():
-        return {"message": "Binance Quant Trading API", "version": "2.0.0"}
-    
-    @app.get("/health")
-    async def health_check():
-        return {"status": "healthy", "running": trading_app.running}
-    
-    @app.get("/status")
-    async def get_status(_: str = Depends(authenticate)):
-        return trading_app.get_status()
-    
-    @app.get("/strategies")
-    async def get_strategies(_: str = Depends(authenticate)):
-        return {
-            "enabled": list(trading_app.components['strategy_manager'].strategies.keys()),
-            "symbols": trading_app.config['trading']['symbols']
-        }
-    
-    @app.post("/strategies/{strategy_name}/toggle")
-    async def toggle_strategy(strategy_name: str, _: str = Depends(authenticate)):
-        # 实现策略启停控制
-        return {"message": f"Strategy {strategy_name} toggled"}
-    
-    @app.get("/performance")
-    async def get_performance(_: str = Depends(authenticate)):
-        stats = await trading_app.components['strategy_manager'].get_performance_stats()
-        return stats
-    
-    @app.get("/positions")
-    async def get_positions(_: str = Depends(authenticate)):
-        positions = await trading_app.components['position_manager'].get_active_positions()
-        return positions
-    
-    return app
+    return credentials.username
+
+@lru_cache(maxsize=1)
+def _root_payload() -> bytes:
+    """首页响应(静态内容, 只编码一次)"""
+    return orjson.dumps({"message": "Binance Quant Trading API", "version": "2.0.0"})
+
+@lru_cache(maxsize=8)
+def _strategies_payload(enabled: Tuple[str, ...], symbols: Tuple[str, ...]) -> bytes:
+    """策略列表响应, 按启用策略和交易对缓存"""
+    return orjson.dumps({"enabled": enabled, "symbols": symbols})
+
+@router.get("/")
+async def root():
+    return Response(_root_payload(), media_type="application/json")
+
+@router.get("/health")
+async def health_check(trading_app = Depends(get_trading_app)):
+    return {"status": "healthy", "running": trading_app.running}
+
+@router.get("/status")
+async def get_status(_: str = Depends(authenticate), trading_app = Depends(get_trading_app)):
+    return trading_app.get_status()
+
+@router.get("/strategies")
+async def get_strategies(_: str = Depends(authenticate), trading_app = Depends(get_trading_app)):
+    payload = _strategies_payload(
+        trading_app.components['strategy_manager'].strategy_names,
+        tuple(trading_app.config['trading']['symbols'])
+    )
+    return Response(payload, media_type="application/json")
+
+@router.post("/strategies/{strategy_name}/toggle")
+async def toggle_strategy(strategy_name: str, _: str = Depends(authenticate)):
+    # 实现策略启停控制
+    return {"message": f"Strategy {strategy_name} toggled"}
+
+@router.get("/performance")
+async def get_performance(_: str = Depends(authenticate), trading_app = Depends(get_trading_app)):
+    stats = await trading_app.components['strategy_manager'].get_performance_stats()
+    return stats
 
-# 添加AI相关路由
-@app.get("/ai/status")
-async def get_ai_status(_: str = Depends(authenticate)):
+@router.get("/positions")
+async def get_positions(_: str = Depends(authenticate), trading_app = Depends(get_trading_app)):
+    positions = await trading_app.components['position_manager'].get_active_positions()
+    return positions
+
+# AI相关路由
+@router.get("/ai/status")
+async def get_ai_status(_: str = Depends(authenticate), trading_app = Depends(get_trading_app)):
     ai_manager = trading_app.components['ai_manager']
     return {
         "active_client": ai_manager.get_active_client_info(),
         "available_clients": ai_manager.get_available_clients()
     }
 
-@app.post("/ai/switch-client/{client_name}")
-async def switch_ai_client(client_name: str, _: str = Depends(authenticate)):
+@router.post("/ai/switch-client/{client_name}")
+async def switch_ai_client(client_name: str, _: str = Depends(authenticate), trading_app = Depends(get_trading_app)):
     ai_manager = trading_app.components['ai_manager']
     success = ai_manager.switch_client(client_name)
     return {"success": success, "active_client": client_name}
 
-@app.get("/ai/signal/{symbol}")
-async def get_ai_signal(symbol: str, _: str = Depends(authenticate)):
+@router.get("/ai/signal/{symbol}")
+async def get_ai_signal(symbol: str, _: str = Depends(authenticate), trading_app = Depends(get_trading_app)):
     ai_manager = trading_app.components['ai_manager']
     market_data = {}  # 获取实际市场数据
     portfolio = {}    # 获取实际持仓数据
     signal = await ai_manager.get_trading_signal(symbol, market_data, portfolio)
     return signal
+
+def create_web_app(trading_app):
+    app = FastAPI(
+        title="Binance Quant Trading",
+        version="2.0.0",
+        default_response_class=ORJSONResponse
+    )
+
+    # CORS 中间件
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    app.state.trading_app = trading_app
+    # 认证凭据预先编码, 每次请求直接比较字节
+    app.state.expected_username = trading_app.config['web_ui']['username'].encode('utf-8')
+    app.state.expected_password = trading_app.config['web_ui']['password'].encode('utf-8')
+    app.include_router(router)
+
+    return app